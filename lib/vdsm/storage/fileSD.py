@@ -679,7 +679,7 @@ class FileStorageDomain(sd.StorageDomain):
                  'mdasize': 0,
                  'mdafree': 0}
         try:
-            st = self.oop.os.statvfs(self.domaindir)
+            st = mount.statvfs(self.domaindir, statvfs=self.oop.os.statvfs)
             stats['disktotal'] = str(st.f_frsize * st.f_blocks)
             stats['diskfree'] = str(st.f_frsize * st.f_bavail)
         except OSError as e:
@@ -709,7 +709,7 @@ class FileStorageDomain(sd.StorageDomain):
         Run internal self test
         """
         try:
-            self.oop.os.statvfs(self.domaindir)
+            mount.statvfs(self.domaindir, statvfs=self.oop.os.statvfs)
         except OSError as e:
             if e.errno == errno.ESTALE:
                 # In case it is "Stale NFS handle" we are taking preventive
@@ -49,6 +49,7 @@ from vdsm.common import concurrent
 from vdsm.common import exception
 from vdsm.common import function
 from vdsm.common import supervdsm
+from vdsm.common import udevadm
 from vdsm.common.marks import deprecated
 from vdsm.common.threadlocal import vars
 from vdsm.common.time import monotonic_time
@@ -2431,25 +2432,49 @@ class HSM(object):
                 "domType=%s, spUUID=%s, conList=%s" %
                 (domType, spUUID, conList)))
 
-        res = []
-        connections = []
+        # The same connection may be sent more than once; connect it once
+        # and report the same status for all of its definitions.
+        unique = {}
+        conObjs = []
+        pending = []
         for conDef in conList:
             conInfo = _connectionDict2ConnectionInfo(domType, conDef)
             conObj = storageServer.ConnectionFactory.createConnection(conInfo)
-            try:
-                self._connectStorageOverIser(conDef, conObj, domType)
-                conObj.connect()
-            except Exception as err:
-                self.log.error(
-                    "Could not connect to storageServer", exc_info=True)
-                status, _ = self._translateConnectionError(err)
+            if conObj in unique:
+                conObj = unique[conObj]
             else:
-                status = 0
-                connections.append(conObj)
+                unique[conObj] = conObj
+                pending.append((conDef, conObj))
+            conObjs.append(conObj)
+
+        # Connect concurrently, so a dead server does not delay connecting
+        # to the other servers.
+        results = {}
+        if pending:
+            max_workers = min(
+                len(pending),
+                config.getint('irs', 'connect_storage_max_workers'))
+            for r in concurrent.tmap(
+                    partial(self._connectStorageConnection, domType),
+                    pending,
+                    max_workers=max_workers,
+                    name="connect"):
+                conObj, status, elapsed = r.value
+                results[conObj] = (status, elapsed)
 
-            res.append({'id': conDef["id"], 'status': status})
+        res = []
+        for conDef, conObj in zip(conList, conObjs):
+            status, elapsed = results[conObj]
+            res.append({'id': conDef["id"], 'status': status,
+                        'elapsed': elapsed})
+
+        connections = [conObj for _, conObj in pending
+                       if results[conObj][0] == 0]
 
         if connections and domType == sd.ISCSI_DOMAIN:
+            # Wait once for udev events from all the logins.
+            udevadm.settle(config.getint("irs", "udev_settle_timeout"))
+
             # We sleep here for 5 seconds (by default), to allow time for
             # the devices to become visible by the host after iscsiadm
             # login. It seems that in newer kernels the time it takes for
@@ -2497,6 +2522,30 @@ class HSM(object):
         sdCache.invalidateStorage()
         return dict(statuslist=res)
 
+    def _connectStorageConnection(self, domType, item):
+        """
+        Connect a single connection, called from the connect worker threads.
+
+        Returns tuple (conObj, status, elapsed) where status is 0 if the
+        connection was successful, and elapsed is the time spent connecting
+        in seconds.
+        """
+        conDef, conObj = item
+        start = monotonic_time()
+        try:
+            self._connectStorageOverIser(conDef, conObj, domType)
+            conObj.connect()
+        except Exception as err:
+            self.log.error(
+                "Could not connect to storageServer", exc_info=True)
+            status, _ = self._translateConnectionError(err)
+        else:
+            status = 0
+        elapsed = monotonic_time() - start
+        self.log.info("Connection id=%s status=%s elapsed=%.2f",
+                      conDef["id"], status, elapsed)
+        return conObj, status, elapsed
+
     @deprecated
     def _connectStorageOverIser(self, conDef, conObj, conTypeId):
         """
@@ -32,7 +32,8 @@ import uuid
 
 from six.moves import queue
 
-from vdsm.common.units import KiB
+import vdsm.common.time
+from vdsm.common.units import KiB, MiB
 from vdsm.config import config
 from vdsm.storage import misc
 from vdsm.storage import task
@@ -51,10 +52,13 @@ MAILBOX_SIZE = 4 * KiB
 PACKED_UUID_SIZE = 16
 VOLUME_MAX_SIZE = 0xFFFFFFFF  # 64 bit unsigned max size
 SIZE_CHARS = 16
+FREE_SPACE_CHARS = 10
 MESSAGE_VERSION = b"1"
 MESSAGE_SIZE = 64
 CLEAN_MESSAGE = b"\1" * MESSAGE_SIZE
 EXTEND_CODE = b"xtnd"
+EXTEND_SD_OFFSET = 5
+EXTEND_FREE_SPACE_OFFSET = EXTEND_SD_OFFSET + 2 * PACKED_UUID_SIZE + SIZE_CHARS
 REPLY_OK = 1
 EMPTYMAILBOX = MAILBOX_SIZE * b"\0"
 SLOTS_PER_MAILBOX = int(MAILBOX_SIZE // MESSAGE_SIZE)
@@ -117,12 +121,18 @@ class SPM_Extend_Message:
 
         # Message structure is rigid (order must be kept and is relied upon):
         # Version (1 byte), OpCode (4 bytes), Domain UUID (16 bytes), Volume
-        # UUID (16 bytes), Requested size (16 bytes), Padding to 64 bytes (14
-        # bytes)
+        # UUID (16 bytes), Requested size (16 bytes), Free space in MiB (10
+        # bytes, optional), Padding to 64 bytes (1 byte)
+        # Older hosts ignore the free space, and send zero padding instead,
+        # which is handled as no free space.
         domain = misc.packUuid(volumeData['domainID'])
         volume = misc.packUuid(volumeData['volumeID'])
         size = b'%0*x' % (SIZE_CHARS, newSize)
         payload = MESSAGE_VERSION + EXTEND_CODE + domain + volume + size
+        if volumeData.get('freeSpace') is not None:
+            free_mb = min(volumeData['freeSpace'] // MiB,
+                          16**FREE_SPACE_CHARS - 1)
+            payload += b'%0*x' % (FREE_SPACE_CHARS, free_mb)
         # Pad payload with zeros
         self.payload = payload.ljust(MESSAGE_SIZE, b"0")
 
@@ -148,29 +158,94 @@ class SPM_Extend_Message:
         #    raise RuntimeError('Request failed')
         return REPLY_OK
 
+    @classmethod
+    def requestDomain(cls, payload):
+        """
+        Return the packed domain UUID of a request payload, used to batch
+        the requests of the same domain.
+        """
+        return payload[EXTEND_SD_OFFSET:EXTEND_SD_OFFSET + PACKED_UUID_SIZE]
+
+    @classmethod
+    def processRequests(cls, pool, requests):
+        """
+        Process a batch of extend requests for the same domain, received
+        in the same mailbox check, serving first the volumes with the
+        least free space.
+
+        lvm cannot extend multiple LVs in one command, so the volumes are
+        extended one by one, and every request is replied as soon as its
+        volume is extended.
+
+        :param requests: list of (msgID, payload) tuples
+        """
+        clock = vdsm.common.time.Clock()
+        clock.start("total")
+        parsed = []
+        for msgID, payload in requests:
+            cls.log.debug("processRequests, payload:" + repr(payload))
+            volume, size, free = cls._parseRequest(pool, payload)
+            # Time spent waiting for other requests in the batch.
+            req_clock = vdsm.common.time.Clock()
+            req_clock.start("wait")
+            parsed.append((free, msgID, volume, size, req_clock))
+        parsed.sort(key=lambda req: req[0])
+
+        if len(parsed) > 1:
+            cls.log.info("processRequests: extending %d volumes in domain %s "
+                         "(pool %s)", len(parsed), parsed[0][2]['domainID'],
+                         pool.spUUID)
+
+        for free, msgID, volume, size, req_clock in parsed:
+            req_clock.stop("wait")
+            cls._extendVolume(pool, msgID, volume, size, free, req_clock)
+
+        clock.stop("total")
+        cls.log.debug("processRequests: processed %d requests %s",
+                      len(parsed), clock)
+        return {'status': {'code': 0, 'message': 'Done'}}
+
     @classmethod
     def processRequest(cls, pool, msgID, payload):
         cls.log.debug("processRequest, payload:" + repr(payload))
-        sdOffset = 5
-        volumeOffset = sdOffset + PACKED_UUID_SIZE
+        volume, size, free = cls._parseRequest(pool, payload)
+        cls._extendVolume(pool, msgID, volume, size, free)
+        return {'status': {'code': 0, 'message': 'Done'}}
+
+    @classmethod
+    def _parseRequest(cls, pool, payload):
+        volumeOffset = EXTEND_SD_OFFSET + PACKED_UUID_SIZE
         sizeOffset = volumeOffset + PACKED_UUID_SIZE
+        freeOffset = sizeOffset + SIZE_CHARS
 
         volume = {}
         volume['poolID'] = pool.spUUID
         volume['domainID'] = misc.unpackUuid(
-            payload[sdOffset:sdOffset + PACKED_UUID_SIZE])
+            payload[EXTEND_SD_OFFSET:EXTEND_SD_OFFSET + PACKED_UUID_SIZE])
         volume['volumeID'] = misc.unpackUuid(
             payload[volumeOffset:volumeOffset + PACKED_UUID_SIZE])
         size = int(payload[sizeOffset:sizeOffset + SIZE_CHARS], 16)
+        try:
+            free = int(payload[freeOffset:freeOffset + FREE_SPACE_CHARS], 16)
+        except ValueError:
+            free = 0
+        return volume, size, free
 
+    @classmethod
+    def _extendVolume(cls, pool, msgID, volume, size, free, clock=None):
         cls.log.info("processRequest: extending volume %s "
-                     "in domain %s (pool %s) to size %d", volume['volumeID'],
-                     volume['domainID'], volume['poolID'], size)
+                     "in domain %s (pool %s) to size %d (free %d)",
+                     volume['volumeID'], volume['domainID'],
+                     volume['poolID'], size, free)
 
+        if clock is None:
+            clock = vdsm.common.time.Clock()
         msg = None
         try:
             try:
-                pool.extendVolume(volume['domainID'], volume['volumeID'], size)
+                with clock.run("extend"):
+                    pool.extendVolume(
+                        volume['domainID'], volume['volumeID'], size)
                 msg = SPM_Extend_Message(volume, size)
             except:
                 cls.log.error("processRequest: Exception caught while trying "
@@ -179,8 +254,15 @@ class SPM_Extend_Message:
                               exc_info=True)
                 msg = SPM_Extend_Message(volume, 0)
         finally:
-            pool.spmMailer.sendReply(msgID, msg)
-            return {'status': {'code': 0, 'message': 'Done'}}
+            try:
+                with clock.run("reply"):
+                    pool.spmMailer.sendReply(msgID, msg)
+            except Exception:
+                cls.log.exception("processRequest: Error sending reply for "
+                                  "volume: %s in domain: %s",
+                                  volume['volumeID'], volume['domainID'])
+            cls.log.debug("processRequest: volume %s done %s",
+                          volume['volumeID'], clock)
 
 
 class HSM_Mailbox:
@@ -395,7 +477,8 @@ class HSM_MailMonitor(object):
                     freeSlot = i
                 continue
             duplicate = True
-            for j in range(0, MESSAGE_SIZE):
+            # The optional free space is not part of the request identity.
+            for j in range(0, EXTEND_FREE_SPACE_OFFSET):
                 if message[j] != self._activeMessages[i][j]:
                     duplicate = False
                     break
@@ -510,8 +593,19 @@ class SPM_MailMonitor:
     def registerMessageType(self, messageType, callback):
         self._messageTypes[messageType] = callback
 
+    def registerBatchMessageType(self, messageType, callback, batchKey):
+        """
+        Register a callback processing in one task all the new messages of
+        messageType with the same batchKey(payload), found in the same
+        mailbox check. The callback is called with a list of (msgID,
+        payload) tuples.
+        """
+        self._messageTypes[messageType] = (callback, batchKey)
+        self._batchMessageTypes.add(messageType)
+
     def unregisterMessageType(self, messageType):
         del self._messageTypes[messageType]
+        self._batchMessageTypes.discard(messageType)
 
     def __init__(self, poolID, maxHostID, inbox, outbox, monitorInterval=2):
         """
@@ -519,6 +613,7 @@ class SPM_MailMonitor:
         mailbox file, and vice versa.
         """
         self._messageTypes = {}
+        self._batchMessageTypes = set()
         # Save arguments
         self._stop = False
         self._stopped = False
@@ -608,6 +703,7 @@ class SPM_MailMonitor:
     def _handleRequests(self, newMail):
 
         send = False
+        batches = {}
 
         # run through all messages and check if new messages have arrived
         # (since last read)
@@ -671,7 +767,12 @@ class SPM_MailMonitor:
                 # We only get here if there is a novel request
                 try:
                     msgType = newMail[msgStart + 1:msgStart + 5]
-                    if msgType in self._messageTypes:
+                    if msgType in self._batchMessageTypes:
+                        newMsg = newMail[msgStart:msgStart + MESSAGE_SIZE]
+                        callback, batchKey = self._messageTypes[msgType]
+                        key = (msgType, batchKey(newMsg))
+                        batches.setdefault(key, []).append((msgId, newMsg))
+                    elif msgType in self._messageTypes:
                         # Use message class to process request according to
                         # message specific logic
                         id = str(uuid.uuid4())
@@ -698,9 +799,24 @@ class SPM_MailMonitor:
                                    newMail[msgStart:msgStart + MESSAGE_SIZE],
                                    exc_info=True)
 
+        for (msgType, _), requests in batches.items():
+            self._queueBatch(msgType, requests)
+
         self._incomingMail = newMail
         return send
 
+    def _queueBatch(self, msgType, requests):
+        try:
+            callback, _ = self._messageTypes[msgType]
+            self.log.debug("SPM_MailMonitor: processing %d requests: %s",
+                           len(requests), requests)
+            id = str(uuid.uuid4())
+            if not self.tp.queueTask(id, runTask, (callback, requests)):
+                raise Exception()
+        except:
+            self.log.error("SPM_MailMonitor: exception caught while "
+                           "handling messages: %s", requests, exc_info=True)
+
     def _checkForMail(self):
         # Lock is acquired in order to make sure that
         # incomingMail is not changed during checkForMail
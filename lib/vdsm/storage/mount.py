@@ -24,7 +24,9 @@ import errno
 import logging
 import os
 import re
+import select
 import stat
+import threading
 
 from collections import namedtuple
 
@@ -35,6 +37,7 @@ from vdsm.common import commands
 from vdsm.common import supervdsm
 from vdsm.common import systemd
 from vdsm.common import udevadm
+from vdsm.common.time import monotonic_time
 from vdsm.config import config
 from vdsm.storage import fileUtils
 
@@ -142,15 +145,142 @@ def _iterKnownMounts():
             yield _parseFstabLine(line)
 
 
-def _iterMountRecords():
+def _readMountRecords():
+    records = []
     for rec in _iterKnownMounts():
         realSpec = _resolveLoopDevice(rec.fs_spec)
-        if rec.fs_spec == realSpec:
-            yield rec
-            continue
+        if rec.fs_spec != realSpec:
+            rec = MountRecord(realSpec, rec.fs_file, rec.fs_vfstype,
+                              rec.fs_mntops, rec.fs_freq, rec.fs_passno)
+        records.append(rec)
+    return tuple(records)
+
+
+class _MountTable(object):
+    """
+    Host wide cache of the mount table.
+
+    The kernel reports POLLPRI | POLLERR on an open /proc/mounts file when
+    the mount table changes, so we keep the file open and parse the table
+    again only when poll() reports a change, instead of parsing it on every
+    lookup.
+
+    Files outside /proc (used by the tests) cannot be polled and are parsed
+    on every lookup.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._path = None
+        self._file = None
+        self._poller = None
+        self._records = ()
+        self._generation = 0
+
+    @property
+    def generation(self):
+        """
+        Incremented each time the mount table was found changed.
+        """
+        return self._generation
+
+    def records(self):
+        with self._lock:
+            if self._changed():
+                self._records = _readMountRecords()
+                self._generation += 1
+            return self._records
+
+    def _changed(self):
+        if self._path != _PROC_MOUNTS_PATH:
+            self._close()
+            self._path = _PROC_MOUNTS_PATH
+            if self._path.startswith("/proc/"):
+                self._file = open(self._path, "r")
+                self._poller = select.poll()
+                self._poller.register(self._file.fileno(),
+                                      select.POLLPRI | select.POLLERR)
+            return True
+
+        if self._poller is None:
+            return True
+
+        # Polling clears the event, so a change after this point will be
+        # reported on the next lookup.
+        return bool(self._poller.poll(0))
+
+    def _close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._poller = None
+
+
+_mount_table = _MountTable()
 
-        yield MountRecord(realSpec, rec.fs_file, rec.fs_vfstype,
-                          rec.fs_mntops, rec.fs_freq, rec.fs_passno)
+
+def _iterMountRecords():
+    return iter(_mount_table.records())
+
+
+class _StatvfsCache(object):
+    """
+    Host wide cache of statvfs() results, shared by the storage domain
+    monitors, the domain stats verbs and the host sampling.
+
+    Concurrent callers asking for the same path wait for the single call in
+    flight, and failures are cached like results, so a hung server is not
+    accessed again by every caller. The cache is dropped when the mount
+    table changes.
+    """
+
+    def __init__(self, clock=monotonic_time):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._path_locks = {}
+        self._generation = None
+
+    def get(self, path, max_age, statvfs):
+        with self._lock:
+            generation = _mount_table.generation
+            if generation != self._generation:
+                self._entries.clear()
+                self._generation = generation
+            path_lock = self._path_locks.setdefault(path, threading.Lock())
+
+        with path_lock:
+            entry = self._entries.get(path)
+            if entry is None or self._clock() - entry[0] >= max_age:
+                try:
+                    entry = (self._clock(), statvfs(path), None)
+                except Exception as e:
+                    entry = (self._clock(), None, e)
+                self._entries[path] = entry
+
+        if entry[2] is not None:
+            raise entry[2]
+        return entry[1]
+
+
+_statvfs_cache = _StatvfsCache()
+
+
+def statvfs(path, statvfs=os.statvfs):
+    """
+    Return statvfs() result for path, using the host wide cache.
+
+    Arguments:
+        path (str): path on the file system
+        statvfs (callable): function used when the result is not cached.
+            Storage domains pass their out of process statvfs, so a hung
+            server blocks only the ioprocess.
+    """
+    # Look up the mount table first, so mounts and unmounts since the
+    # last call drop stale results.
+    _mount_table.records()
+    max_age = config.getint("irs", "statvfs_cache_timeout")
+    return _statvfs_cache.get(path, max_age, statvfs)
 
 
 def iterMounts():
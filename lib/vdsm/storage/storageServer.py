@@ -32,7 +32,6 @@ import sys
 from vdsm.config import config
 from vdsm import utils
 from vdsm.common import supervdsm
-from vdsm.common import udevadm
 from vdsm.gluster import cli as gluster_cli
 from vdsm.gluster import exception as ge
 from vdsm.storage import exception as se
@@ -503,9 +502,9 @@ class IscsiConnection(object):
         self._cred = credentials
 
     def connect(self):
+        # Waiting for udev events is done by the caller once all the
+        # connections are established.
         iscsi.addIscsiNode(self._iface, self._target, self._cred)
-        timeout = config.getint("irs", "udev_settle_timeout")
-        udevadm.settle(timeout)
 
     def _match(self, session):
         target = session.target
@@ -621,7 +620,7 @@ class FcpConnection(object):
         return True
 
     def __eq__(self, other):
-        return (self.__class__ == other.__class and
+        return (self.__class__ == other.__class__ and
                 self._id == other._id)
 
     def __ne__(self, other):
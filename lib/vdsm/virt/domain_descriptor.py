@@ -22,6 +22,7 @@ from __future__ import absolute_import
 from __future__ import division
 
 from contextlib import contextmanager
+import copy
 import xml.etree.ElementTree as etree
 
 from vdsm.common import xmlutils
@@ -143,12 +144,16 @@ class DomainDescriptor(MutableDomainDescriptor):
         self._initial = initial
         self._devices = super(DomainDescriptor, self).devices
         if self._initial:
+            self._device_hashes = None
             self._devices_hash = None
         else:
-            self._devices_hash = super(DomainDescriptor, self).devices_hash
+            self._device_hashes = _device_hashes(self._devices)
+            self._devices_hash = _combine_hashes(self._device_hashes)
 
     @property
     def xml(self):
+        if self._xml is None:
+            self._xml = xmlutils.tostring(self._dom)
         return self._xml
 
     @property
@@ -159,6 +164,96 @@ class DomainDescriptor(MutableDomainDescriptor):
     def devices_hash(self):
         return self._devices_hash
 
+    @property
+    def initial(self):
+        return self._initial
+
     @contextmanager
     def metadata_descriptor(self):
         yield metadata.Descriptor.from_tree(self._dom)
+
+    def with_metadata(self, md_desc):
+        """
+        Return a new descriptor with the metadata group managed by `md_desc`
+        replaced by its current content, as it would be reported by libvirt
+        after `md_desc.dump()`.
+
+        The device tree is shared with this descriptor, so the devices hash
+        is not recomputed.
+
+        :param md_desc: metadata descriptor to take the content from
+        :type md_desc: metadata.Descriptor
+        :rtype: DomainDescriptor
+        """
+        md_tree = md_desc.to_tree()
+        root = copy.copy(self._dom)
+        old_md = vmxml.find_first(root, 'metadata', None)
+        if old_md is None:
+            md_elem = etree.Element('metadata')
+            vmxml.append_child(root, etree_child=md_elem)
+        else:
+            md_elem = copy.copy(old_md)
+            root[list(root).index(old_md)] = md_elem
+            for child in md_elem.findall(md_tree.tag):
+                md_elem.remove(child)
+        vmxml.append_child(md_elem, etree_child=md_tree)
+        return self._derive(root, self._devices, self._device_hashes)
+
+    def without_device(self, alias):
+        """
+        Return a new descriptor without the device identified by `alias`,
+        as it would be reported by libvirt once the device removal completed.
+
+        Only the hash of the removed device is dropped; the hashes of the
+        remaining devices are reused.
+
+        :param alias: alias of the device to remove
+        :type alias: string
+        :raises LookupError: if no device with the given alias exists
+        :rtype: DomainDescriptor
+        """
+        if self._devices is None:
+            raise LookupError("No devices in domain %s" % self._id)
+        for index, dev in enumerate(self._devices):
+            if vmxml.find_attr(dev, 'alias', 'name') == alias:
+                break
+        else:
+            raise LookupError("No device with alias %r" % alias)
+        devices = copy.copy(self._devices)
+        devices.remove(dev)
+        root = copy.copy(self._dom)
+        root[list(root).index(self._devices)] = devices
+        device_hashes = None
+        if self._device_hashes is not None:
+            device_hashes = (
+                self._device_hashes[:index] + self._device_hashes[index + 1:])
+        return self._derive(root, devices, device_hashes)
+
+    def _derive(self, root, devices, device_hashes):
+        desc = DomainDescriptor.__new__(DomainDescriptor)
+        desc._dom = root
+        desc._id = self._id
+        desc._name = self._name
+        desc._xml = None
+        desc._initial = self._initial
+        desc._devices = devices
+        desc._device_hashes = device_hashes
+        if self._initial:
+            desc._devices_hash = None
+        else:
+            desc._devices_hash = _combine_hashes(device_hashes)
+        return desc
+
+
+def _device_hashes(devices):
+    if devices is None:
+        return None
+    # Trailing whitespace depends on the position of the device in the
+    # devices list, drop it to keep device hashes position independent.
+    return [hash(xmlutils.tostring(dev).rstrip()) for dev in devices]
+
+
+def _combine_hashes(device_hashes):
+    if device_hashes is None:
+        return hash('')
+    return hash(tuple(device_hashes))
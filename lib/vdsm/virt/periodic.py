@@ -43,6 +43,7 @@ from vdsm.virt import recovery
 from vdsm.virt import sampling
 from vdsm.virt import virdomain
 from vdsm.virt import vmstatus
+from vdsm.virt.vmdevices import storage
 
 
 # Just a made up number. Maybe should be equal to number of cores?
@@ -52,6 +53,7 @@ _TASK_PER_WORKER = config.getint('sampling', 'periodic_task_per_worker')
 _TASKS = _WORKERS * _TASK_PER_WORKER
 _MAX_WORKERS = config.getint('sampling', 'max_workers')
 _THROTTLING_INTERVAL = 10  # seconds
+_NOWAIT_ENABLED = config.getboolean('vars', 'nowait_domain_stats')
 
 _operations = []
 _executor = None
@@ -374,13 +376,143 @@ class BlockjobMonitor(_RunnableOnVm):
 
 class DriveWatermarkMonitor(_RunnableOnVm):
 
+    def __init__(self, vm, block_stats=None):
+        super(DriveWatermarkMonitor, self).__init__(vm)
+        self._block_stats = block_stats
+
     @property
     def required(self):
         return (super(DriveWatermarkMonitor, self).required and
                 self._vm.drive_monitor.monitoring_needed())
 
     def _execute(self):
-        self._vm.monitor_drives()
+        self._vm.monitor_drives(block_stats=self._block_stats)
+
+
+class DriveWatermarkCollector(object):
+    """
+    Collect the block info of the drives of all the VMs needing drive
+    monitoring using one bulk stats call, then dispatch one
+    DriveWatermarkMonitor per VM using the collected values.
+
+    VMs whose stats are not available, because the bulk call failed or
+    is still blocked from a previous cycle, fall back to the per-drive
+    blockInfo() queries.
+    """
+
+    _log = logging.getLogger("virt.periodic.DriveWatermarkCollector")
+
+    def __init__(self, conn, get_vms, executor, timeout):
+        """
+        conn: libvirt connection
+        get_vms: callable which will return a dict which maps
+                 vm_ids to vm_instances
+        executor: executor.Executor instance
+        timeout: per-vm operation timeout, in seconds
+                 (fractions allowed).
+        """
+        self._conn = conn
+        self._get_vms = get_vms
+        self._executor = executor
+        self._timeout = timeout
+        self._sampling = threading.Semaphore()  # used as glorified counter
+
+    def __call__(self):
+        vms = self._get_vms()
+        monitored = []
+        skipped = []
+
+        for vm_id, vm_obj in six.viewitems(vms):
+            op = DriveWatermarkMonitor(vm_obj)
+            try:
+                if not op.required:
+                    continue
+                # Same as VmDispatcher, avoid piling up jobs on blocked
+                # domains.
+                if not op.runnable:
+                    skipped.append(vm_id)
+                    continue
+            except Exception:
+                self._log.exception("while dispatching %s", op)
+            else:
+                monitored.append(vm_obj)
+
+        stats = self._collect(monitored)
+
+        for vm_obj in monitored:
+            op = DriveWatermarkMonitor(vm_obj, stats.get(vm_obj.id))
+            try:
+                self._executor.dispatch(op, self._timeout)
+            except exception.ResourceExhausted:
+                skipped.append(vm_obj.id)
+
+        if skipped:
+            self._log.warning('could not run %s on %s',
+                              DriveWatermarkMonitor, skipped)
+        return skipped  # for testing purposes
+
+    def _collect(self, vms):
+        """
+        Return a dict mapping vm ids to the block stats of their drives,
+        see _block_stats_from_bulk_stats. Returns an empty dict if the
+        stats cannot be collected.
+        """
+        if not vms:
+            return {}
+
+        if not self._sampling.acquire(blocking=False):
+            self._log.warning(
+                'previous bulk block stats call still in progress, '
+                'falling back to per-drive queries')
+            return {}
+
+        flags = 0
+        if _NOWAIT_ENABLED:
+            flags |= libvirt.VIR_CONNECT_GET_ALL_DOMAINS_STATS_NOWAIT
+        try:
+            doms = []
+            for vm_obj in vms:
+                try:
+                    # TODO: see VMBulkstatsMonitor._get_responsive_doms.
+                    doms.append(vm_obj._dom._dom)
+                except AttributeError:
+                    # domain not connected yet or anymore.
+                    continue
+            if not doms:
+                return {}
+            bulk_stats = self._conn.domainListGetStats(
+                doms, stats=libvirt.VIR_DOMAIN_STATS_BLOCK, flags=flags)
+        except Exception:
+            self._log.exception("bulk block stats sampling failed")
+            return {}
+        finally:
+            self._sampling.release()
+
+        return {dom.UUIDString(): _block_stats_from_bulk_stats(dom_stats)
+                for dom, dom_stats in bulk_stats}
+
+    def __repr__(self):
+        return '<DriveWatermarkCollector at 0x%x>' % id(self)
+
+
+def _block_stats_from_bulk_stats(dom_stats):
+    """
+    Return a dict mapping drive paths to storage.BlockInfo, as reported
+    by libvirt blockInfo(), from the block stats of one domain.
+    Drives with incomplete stats are skipped.
+    """
+    block_stats = {}
+    for index in range(dom_stats.get('block.count', 0)):
+        prefix = 'block.%d.' % index
+        try:
+            path = dom_stats[prefix + 'path']
+            block_stats[path] = storage.BlockInfo(
+                dom_stats[prefix + 'capacity'],
+                dom_stats[prefix + 'allocation'],
+                dom_stats[prefix + 'physical'])
+        except KeyError:
+            continue
+    return block_stats
 
 
 def _kill_long_paused_vms(cif):
@@ -398,6 +530,8 @@ def _create(cif, scheduler):
             cif.getVMs, _executor, func, _timeout_from(period))
         return Operation(disp, period, scheduler)
 
+    watermark_interval = config.getint('vars', 'vm_watermark_interval')
+
     ops = [
         # Needs dispatching because updating the volume stats needs
         # access to the storage, thus can block.
@@ -411,11 +545,17 @@ def _create(cif, scheduler):
             config.getint('vars', 'vm_sample_jobs_interval')),
 
         # We do this only until we get high water mark notifications
-        # from QEMU. It accesses storage and/or QEMU monitor, so can block,
-        # thus we need dispatching.
-        per_vm_operation(
-            DriveWatermarkMonitor,
-            config.getint('vars', 'vm_watermark_interval')),
+        # from QEMU. The block info of all the VMs is collected using one
+        # bulk stats call; the extension flow accesses storage and/or QEMU
+        # monitor, so can block, thus we need dispatching.
+        Operation(
+            DriveWatermarkCollector(
+                libvirtconnection.get(cif),
+                cif.getVMs,
+                _executor,
+                _timeout_from(watermark_interval)),
+            watermark_interval,
+            scheduler),
 
         Operation(
             lambda: recovery.lookup_external_vms(cif),
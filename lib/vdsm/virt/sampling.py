@@ -44,6 +44,7 @@ from vdsm.common.units import KiB, MiB
 from vdsm.config import config
 from vdsm.constants import P_VDSM_RUN
 from vdsm.host import api as hostapi
+from vdsm.storage import mount
 from vdsm.virt.utils import ExpiringCache
 
 
@@ -150,7 +151,7 @@ class HostSample(object):
         for p in self.MONITORED_PATHS:
             free = 0
             try:
-                stat = os.statvfs(p)
+                stat = mount.statvfs(p)
                 free = stat.f_bavail * stat.f_bsize // MiB
             except:
                 pass
@@ -408,6 +408,7 @@ class Vm(object):
         self._post_copy = migration.PostCopyPhase.NONE
         self._consoleDisconnectAction = ConsoleDisconnectAction.LOCK_SCREEN
         self._confLock = threading.Lock()
+        self._domainDescriptorLock = threading.RLock()
         self._jobsLock = threading.Lock()
         self._statusLock = threading.Lock()
         self._creationThread = concurrent.thread(self._startUnderlyingVm,
@@ -1136,12 +1137,18 @@ class Vm(object):
                 if (drive.chunked or drive.replicaChunked) and not
                 drive.readonly]
 
-    def _getExtendInfo(self, drive):
+    def _getExtendInfo(self, drive, block_info=None):
         """
         Return extension info for a chunked drive or drive replicating to
         chunked replica volume.
+
+        If `block_info` is given, it is used instead of querying libvirt
+        for the drive block info.
         """
-        capacity, alloc, physical = self._dom.blockInfo(drive.path, 0)
+        if block_info is None:
+            capacity, alloc, physical = self._dom.blockInfo(drive.path, 0)
+        else:
+            capacity, alloc, physical = block_info
 
         # Libvirt reports watermarks only for the source drive, but for
         # file-based drives it reports the same alloc and physical, which
@@ -1157,6 +1164,7 @@ class Vm(object):
             physical = volsize.apparentsize
 
         blockinfo = vmdevices.storage.BlockInfo(capacity, alloc, physical)
+        drive.update_write_rate(alloc)
 
         if blockinfo != drive.blockinfo:
             drive.blockinfo = blockinfo
@@ -1165,22 +1173,29 @@ class Vm(object):
 
         return blockinfo
 
-    def monitor_drives(self):
+    def monitor_drives(self, block_stats=None):
         """
         Return True if at least one drive is being extended, False otherwise.
+
+        `block_stats` is an optional dict mapping drive paths to
+        vmdevices.storage.BlockInfo, as collected in bulk for all the VMs.
+        Drives missing from `block_stats` are queried using blockInfo().
         """
         extended = False
+        if block_stats is None:
+            block_stats = {}
 
         try:
             for drive in self.drive_monitor.monitored_drives():
-                if self.extend_drive_if_needed(drive):
+                block_info = block_stats.get(drive.path)
+                if self.extend_drive_if_needed(drive, block_info=block_info):
                     extended = True
         except drivemonitor.ImprobableResizeRequestError:
             return False
 
         return extended
 
-    def extend_drive_if_needed(self, drive):
+    def extend_drive_if_needed(self, drive, block_info=None):
         """
         Check if a drive should be extended, and start extension flow if
         needed.
@@ -1197,6 +1212,9 @@ class Vm(object):
         - SET: this method should never receive a drive in this state,
                emit warning and exit.
 
+        If `block_info` is given, it is used instead of querying libvirt
+        for the drive block info.
+
         Return True if started an extension flow, False otherwise.
         """
 
@@ -1207,7 +1225,8 @@ class Vm(object):
             return
 
         try:
-            capacity, alloc, physical = self._getExtendInfo(drive)
+            capacity, alloc, physical = self._getExtendInfo(
+                drive, block_info=block_info)
         except libvirt.libvirtError as e:
             self.log.error("Unable to get watermarks for drive %s: %s",
                            drive.name, e)
@@ -1317,6 +1336,8 @@ class Vm(object):
             'volumeID': volumeID,
             'clock': clock,
         }
+        if not volInfo['internal']:
+            self._add_free_space(volInfo, vmDrive)
         self.log.debug("Requesting an extension for the volume: %s", volInfo)
         self.cif.irs.sendExtendMsg(
             vmDrive.poolID,
@@ -1335,6 +1356,7 @@ class Vm(object):
             'volumeID': drive.diskReplicate['volumeID'],
             'clock': clock,
         }
+        self._add_free_space(volInfo, drive)
         self.log.debug("Requesting an extension for the volume "
                        "replication: %s", volInfo)
         self.cif.irs.sendExtendMsg(drive.poolID,
@@ -1342,6 +1364,12 @@ class Vm(object):
                                    newSize,
                                    self.__afterReplicaExtension)
 
+    def _add_free_space(self, volInfo, drive):
+        # Let the SPM serve first the volumes closest to running out of space.
+        if drive.blockinfo is not None:
+            volInfo['freeSpace'] = max(
+                0, drive.blockinfo.physical - drive.blockinfo.allocation)
+
     def __afterVolumeExtension(self, volInfo):
         clock = volInfo["clock"]
         clock.stop("extend-volume")
@@ -1927,7 +1955,7 @@ class Vm(object):
             )
         try:
             self._sync_metadata()
-            self._updateDomainDescriptor()
+            self._update_domain_metadata()
         except (libvirt.libvirtError, virdomain.NotConnectedError) as e:
             self.log.warning("Couldn't update metadata: %s", e)
             return
@@ -2815,7 +2843,7 @@ class Vm(object):
             raise
         if update_metadata:
             self._hotunplug_device_metadata(device_hwclass, device)
-            self._updateDomainDescriptor()
+            self._update_domain_metadata()
 
     @api.guard(_not_migrating)
     # This hot plug must be able to take multiple devices so that
@@ -4585,8 +4613,40 @@ class Vm(object):
         return self._domain.name
 
     def _updateDomainDescriptor(self, xml=None):
-        domxml = self._dom.XMLDesc(0) if xml is None else xml
-        self._domain = DomainDescriptor(domxml, initial=(xml is not None))
+        with self._domainDescriptorLock:
+            domxml = self._dom.XMLDesc(0) if xml is None else xml
+            self._domain = DomainDescriptor(domxml, initial=(xml is not None))
+
+    def _update_domain_metadata(self):
+        """
+        Update the domain descriptor after a metadata only change, i.e. after
+        self._sync_metadata(), without fetching the domain XML from libvirt.
+        """
+        self._apply_domain_delta(
+            lambda domain: domain.with_metadata(self._md_desc))
+
+    def _remove_domain_device(self, alias):
+        """
+        Update the domain descriptor after libvirt reported the removal
+        of the device identified by `alias`.
+        """
+        self._apply_domain_delta(
+            lambda domain: domain.without_device(alias))
+
+    def _apply_domain_delta(self, delta):
+        with self._domainDescriptorLock:
+            # Metadata of external VMs is not synced to libvirt, and initial
+            # descriptors miss the information filled in by libvirt; the
+            # cached tree cannot be trusted in either case.
+            if self._external or self._domain.initial:
+                self._updateDomainDescriptor()
+                return
+            try:
+                self._domain = delta(self._domain)
+            except LookupError as e:
+                self.log.debug("Cannot update domain descriptor (%s), "
+                               "reloading domain XML", e)
+                self._updateDomainDescriptor()
 
     def _updateMetadataDescriptor(self):
         # load will overwrite any existing content, as per doc.
@@ -5167,7 +5227,7 @@ class Vm(object):
                 raise BlockJobExistsError()
         self._sync_block_job_info()
         self._sync_metadata()
-        self._updateDomainDescriptor()
+        self._update_domain_metadata()
 
     def untrackBlockJob(self, jobID):
         with self._confLock:
@@ -5181,7 +5241,7 @@ class Vm(object):
         self._sync_disk_metadata()
         self._sync_block_job_info()
         self._sync_metadata()
-        self._updateDomainDescriptor()
+        self._update_domain_metadata()
         return True
 
     def _sync_block_job_info(self):
@@ -5669,7 +5729,7 @@ class Vm(object):
             device.teardown()
         finally:
             device.hotunplug_event.set()
-        self._updateDomainDescriptor()
+        self._remove_domain_device(device_alias)
 
     # Accessing storage
 
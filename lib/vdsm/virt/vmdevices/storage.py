@@ -31,6 +31,7 @@ from vdsm.common import conv
 from vdsm.common import cpuarch
 from vdsm.common import errors
 from vdsm.common import exception
+from vdsm.common.time import monotonic_time
 from vdsm.common.units import MiB
 from vdsm.config import config
 from vdsm import utils
@@ -125,11 +126,14 @@ class Drive(core.Base):
                  'extSharedState', 'drv', 'sgio', 'GUID', 'diskReplicate',
                  '_diskType', 'hosts', 'protocol', 'auth', 'discard',
                  'vm_custom', 'blockinfo', '_threshold_state', '_lock',
-                 '_monitorable', 'guestName', '_iotune', 'RBD')
+                 '_monitorable', 'guestName', '_iotune', 'RBD',
+                 '_alloc_sample', '_write_rate')
     VOLWM_CHUNK_SIZE = (config.getint('irs', 'volume_utilization_chunk_mb') *
                         MiB)
     VOLWM_FREE_PCT = 100 - config.getint('irs', 'volume_utilization_percent')
     VOLWM_CHUNK_REPLICATE_MULT = 2  # Chunk multiplier during replication
+    VOLWM_RATE_WINDOW = config.getint('irs', 'volume_utilization_rate_window')
+    VOLWM_CHUNK_RATE_MAX_MULT = 4  # Max chunk multiplier for fast writers
 
     # Estimate of the additional space needed for qcow format internal data.
     VOLWM_COW_OVERHEAD = 1.1
@@ -255,6 +259,8 @@ class Drive(core.Base):
 
         # Used for chunked drives or drives replicating to chunked replica.
         self.blockinfo = None
+        self._alloc_sample = None
+        self._write_rate = None
 
         self._setExtSharedState()
 
@@ -331,8 +337,50 @@ class Drive(core.Base):
         migration).
         """
         if self.isDiskReplicationInProgress():
-            return self.VOLWM_CHUNK_SIZE * self.VOLWM_CHUNK_REPLICATE_MULT
-        return self.VOLWM_CHUNK_SIZE
+            chunk = self.VOLWM_CHUNK_SIZE * self.VOLWM_CHUNK_REPLICATE_MULT
+        else:
+            chunk = self.VOLWM_CHUNK_SIZE
+
+        if self._write_rate and self.VOLWM_RATE_WINDOW > 0:
+            rate_chunk = utils.round(
+                int(self._write_rate * self.VOLWM_RATE_WINDOW), MiB)
+            chunk = min(max(chunk, rate_chunk),
+                        chunk * self.VOLWM_CHUNK_RATE_MAX_MULT)
+
+        return chunk
+
+    @property
+    def write_rate(self):
+        """
+        Returns the observed write rate in bytes per second, or None if not
+        known yet.
+        """
+        return self._write_rate
+
+    def update_write_rate(self, allocation, now=None):
+        """
+        Update the observed write rate using the current allocation of the
+        drive, as reported by libvirt.
+
+        The rate is computed from the allocation growth since the previous
+        call, so with block threshold events enabled it is the average write
+        rate between extensions.
+        """
+        if now is None:
+            now = monotonic_time()
+        if self._alloc_sample is not None:
+            prev_time, prev_allocation = self._alloc_sample
+            elapsed = now - prev_time
+            if allocation < prev_allocation:
+                # The top volume changed, e.g. after a snapshot.
+                self._write_rate = None
+            elif elapsed > 0:
+                rate = (allocation - prev_allocation) / elapsed
+                if self._write_rate is None:
+                    self._write_rate = rate
+                else:
+                    self._write_rate = (self._write_rate + rate) / 2
+        self._alloc_sample = (now, allocation)
 
     @property
     def watermarkLimit(self):
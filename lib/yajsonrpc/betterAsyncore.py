@@ -21,14 +21,19 @@ from __future__ import division
 
 import asyncore
 import errno
+import heapq
+import itertools
 import logging
+import select
 import socket
 import ssl
+import threading
 
 import six
 
 from vdsm import sslutils
 from vdsm.common.eventfd import EventFD
+from vdsm.common.time import monotonic_time
 
 
 _BLOCKING_IO_ERRORS = (errno.EAGAIN, errno.EALREADY, errno.EINPROGRESS,
@@ -219,50 +224,226 @@ class AsyncoreEvent(asyncore.file_dispatcher):
         asyncore.file_dispatcher.close(self)
 
 
+class _ChannelMap(dict):
+    """
+    asyncore channel map notifying the reactor when channels are added or
+    removed. asyncore.dispatcher add_channel() and del_channel() may be
+    called from any thread.
+    """
+
+    def __init__(self, reactor):
+        dict.__init__(self)
+        self._reactor = reactor
+
+    def __setitem__(self, fd, obj):
+        dict.__setitem__(self, fd, obj)
+        self._reactor._channel_added(fd)
+
+    def __delitem__(self, fd):
+        dict.__delitem__(self, fd)
+        self._reactor._channel_removed(fd)
+
+
 class Reactor(object):
     """
     map dictionary maps sock.fileno() to channels to watch. We add channels to
     it by running add_dispatcher and removing by remove_dispatcher.
-    It is used by asyncore loop to know which channels events to track.
+
+    The channels are watched using epoll. Instead of asking every channel if
+    it is readable or writable and building a new poll set on every
+    iteration, we keep the registered interest of every channel, and check it
+    again only when the channel may have changed:
+
+    - the channel was added
+    - the channel handled an event
+    - the channel check interval (see Dispatcher.next_check_interval()) has
+      expired; check deadlines are kept in a heap
+    - update() was called for the channel
 
     We use eventfd as mechanism to trigger processing when needed.
     """
 
+    # Maximum time between checks of a channel, matching the poll timeout
+    # used before.
+    _MAX_CHECK_INTERVAL = 30.0
+
     def __init__(self):
-        self._map = {}
-        self._is_running = False
+        self._lock = threading.Lock()
+        self._poller = select.epoll()
+        self._masks = {}
+        self._pending = set()
+        self._update_all = False
+        self._deadlines = {}
+        self._timers = []
+        self._timer_seq = itertools.count()
+        self._wakeupEvent = None
+        self._map = _ChannelMap(self)
+        # Set here and not in process_requests(), so stop() called before
+        # the reactor thread started is not lost.
+        self._is_running = True
         self._wakeupEvent = AsyncoreEvent(self._map)
 
     def create_dispatcher(self, sock, impl=None):
         return Dispatcher(impl=impl, sock=sock, map=self._map)
 
     def process_requests(self):
-        self._is_running = True
         while self._is_running:
-            asyncore.loop(
-                timeout=self._get_timeout(self._map),
-                use_poll=True,
-                map=self._map,
-                count=1,
-            )
+            self._update_interests()
+            self._process_events(self._poll_timeout())
+            self._expire_timers()
 
         for dispatcher in list(six.viewvalues(self._map)):
             dispatcher.close()
 
         self._map.clear()
 
-    def _get_timeout(self, map):
-        timeout = 30.0
-        for disp in list(six.viewvalues(self._map)):
-            if hasattr(disp, "next_check_interval"):
-                interval = disp.next_check_interval()
-                if interval is not None and interval >= 0:
-                    timeout = min(interval, timeout)
-        return timeout
+    def update(self, dispatcher):
+        """
+        Check again if dispatcher is readable or writable. Must be called
+        when dispatcher interest changes outside of its event handlers, for
+        example when another thread queues outgoing data.
+
+        May be called from any thread.
+        """
+        fd = getattr(dispatcher, "_fileno", None)
+        if fd is None:
+            return
+        with self._lock:
+            self._pending.add(fd)
+        self._wakeupEvent.set()
 
     def wakeup(self):
+        """
+        Check all dispatchers again. Prefer update() if the changed
+        dispatcher is known.
+        """
+        with self._lock:
+            self._update_all = True
         self._wakeupEvent.set()
 
+    def _channel_added(self, fd):
+        with self._lock:
+            self._pending.add(fd)
+        if self._wakeupEvent is not None:
+            self._wakeupEvent.set()
+
+    def _channel_removed(self, fd):
+        with self._lock:
+            self._pending.discard(fd)
+            self._deadlines.pop(fd, None)
+            if self._masks.pop(fd, 0):
+                self._unregister(fd)
+
+    def _update_interests(self):
+        with self._lock:
+            if self._update_all:
+                self._update_all = False
+                self._pending.clear()
+                pending = list(self._map)
+            else:
+                pending = self._pending
+                self._pending = set()
+
+        now = monotonic_time()
+        for fd in pending:
+            obj = self._map.get(fd)
+            if obj is not None:
+                self._update_interest(fd, obj, now)
+
+    def _update_interest(self, fd, obj, now):
+        interval = None
+        if hasattr(obj, "next_check_interval"):
+            interval = obj.next_check_interval()
+        if interval is None or interval < 0:
+            interval = self._MAX_CHECK_INTERVAL
+
+        # Same flags as asyncore.poll2().
+        mask = 0
+        if obj.readable():
+            mask |= select.EPOLLIN | select.EPOLLPRI
+        if obj.writable() and not obj.accepting:
+            mask |= select.EPOLLOUT
+
+        with self._lock:
+            # readable() and writable() may close the channel.
+            if self._map.get(fd) is not obj:
+                return
+
+            old_mask = self._masks.get(fd, 0)
+            if mask != old_mask:
+                if not mask:
+                    self._unregister(fd)
+                    del self._masks[fd]
+                else:
+                    if old_mask:
+                        self._poller.modify(fd, mask)
+                    else:
+                        self._register(fd, mask)
+                    self._masks[fd] = mask
+
+            # Checking earlier than needed is harmless, so keep a pending
+            # earlier deadline instead of adding a timer on every event.
+            deadline = now + min(interval, self._MAX_CHECK_INTERVAL)
+            pending_deadline = self._deadlines.get(fd)
+            if pending_deadline is not None and pending_deadline <= deadline:
+                return
+            self._deadlines[fd] = deadline
+
+        heapq.heappush(self._timers, (deadline, next(self._timer_seq), fd))
+
+    def _register(self, fd, mask):
+        try:
+            self._poller.register(fd, mask)
+        except EnvironmentError as e:
+            # A closed fd is removed from the epoll set automatically, but
+            # a stale registration of a reused fd is possible.
+            if e.errno != errno.EEXIST:
+                raise
+            self._poller.modify(fd, mask)
+
+    def _unregister(self, fd):
+        try:
+            self._poller.unregister(fd)
+        except EnvironmentError as e:
+            # The fd was closed before the channel was removed.
+            if e.errno not in (errno.ENOENT, errno.EBADF):
+                raise
+
+    def _poll_timeout(self):
+        if not self._timers:
+            return self._MAX_CHECK_INTERVAL
+        return max(0, self._timers[0][0] - monotonic_time())
+
+    def _process_events(self, timeout):
+        try:
+            events = self._poller.poll(timeout)
+        except EnvironmentError as e:
+            if e.errno != errno.EINTR:
+                raise
+            return
+
+        with self._lock:
+            self._pending.update(fd for fd, _ in events)
+
+        for fd, flags in events:
+            obj = self._map.get(fd)
+            if obj is not None:
+                asyncore.readwrite(obj, flags)
+
+    def _expire_timers(self):
+        now = monotonic_time()
+        expired = []
+        while self._timers and self._timers[0][0] <= now:
+            deadline, _, fd = heapq.heappop(self._timers)
+            # Ignore deadlines replaced by an earlier one.
+            if self._deadlines.get(fd) == deadline:
+                self._deadlines.pop(fd, None)
+                expired.append(fd)
+
+        if expired:
+            with self._lock:
+                self._pending.update(expired)
+
     def stop(self):
         self._is_running = False
         try:
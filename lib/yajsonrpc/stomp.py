@@ -612,7 +612,7 @@ class StompConnection(object):
 
     def send_raw(self, msg):
         self._async_client.queue_frame(msg)
-        self._reactor.wakeup()
+        self._reactor.update(self._dispatcher)
 
     def setTimeout(self, timeout):
         self._dispatcher.socket.settimeout(timeout)
@@ -262,6 +262,7 @@ class StompClient(object):
         )
         self._stompConn.set_heartbeat(outgoing_heartbeat, incoming_heartbeat)
         self._aclient.handle_connect()
+        self._reactor.update(self._stompConn.dispatcher)
 
     def setTimeout(self, timeout):
         self._stompConn.setTimeout(timeout)
@@ -283,7 +284,7 @@ class StompClient(object):
 
     def subscribe(self, *args, **kwargs):
         sub = self._aclient.subscribe(*args, **kwargs)
-        self._reactor.wakeup()
+        self._reactor.update(self._stompConn.dispatcher)
         return sub
 
     def unsubscribe(self, sub):
@@ -301,7 +302,7 @@ class StompClient(object):
             message,
             headers
         )
-        self._reactor.wakeup()
+        self._reactor.update(self._stompConn.dispatcher)
 
     def close(self):
         self._stompConn.close()
@@ -117,8 +117,9 @@ class StompAdapterImpl(object):
             resp.headers[stomp.Headers.HEARTBEAT] = "%d,%d" % (cy, cx)
             dispatcher.setHeartBeat(cy, cx)
 
+        # Called from the reactor thread while handling a read event, the
+        # reactor checks the dispatcher again after handling the event.
         self.queue_frame(resp)
-        self._reactor.wakeup()
 
     def _cmd_subscribe(self, dispatcher, frame):
         self.log.info("Subscribe command received")
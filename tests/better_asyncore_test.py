@@ -22,9 +22,15 @@
 from __future__ import absolute_import
 from __future__ import division
 import socket
+import threading
+import time
 from contextlib import closing
+from contextlib import contextmanager
+
+import pytest
 
 from vdsm.common import concurrent
+from yajsonrpc import stompclient
 from yajsonrpc.betterAsyncore import AsyncoreEvent, Reactor
 
 from testlib import VdsmTestCase as TestCaseBase
@@ -69,5 +75,136 @@ class TestReactor(TestCaseBase):
 
         thread.join(timeout=1)
 
+        self.assertFalse(thread.is_alive())
         self.assertTrue(disp.closing)
-        self.assertFalse(reactor._wakeupEvent.closing)
+        self.assertTrue(reactor._wakeupEvent.closing)
+
+    def test_update(self):
+        impl = WritableImpl()
+        with running_reactor() as reactor:
+            s1, s2 = socket.socketpair()
+            with closing(s2):
+                reactor.create_dispatcher(s1, impl=impl)
+                impl.want_write = True
+                reactor.update(impl.dispatcher)
+                self.assertTrue(impl.written.wait(1))
+
+    def test_check_interval(self):
+        impl = WritableImpl(check_interval=0.1)
+        with running_reactor() as reactor:
+            s1, s2 = socket.socketpair()
+            with closing(s2):
+                reactor.create_dispatcher(s1, impl=impl)
+                # Not reported to the reactor, detected when the check
+                # interval expires.
+                impl.want_write = True
+                self.assertTrue(impl.written.wait(1))
+
+    def test_remove_dispatcher(self):
+        with running_reactor() as reactor:
+            s1, s2 = socket.socketpair()
+            with closing(s2):
+                disp = reactor.create_dispatcher(s1, impl=TestingImpl())
+                fd = disp._fileno
+                disp.close()
+                self.assertNotIn(fd, reactor._map)
+                self.assertNotIn(fd, reactor._masks)
+
+
+class WritableImpl(object):
+
+    def __init__(self, check_interval=None):
+        self.check_interval = check_interval
+        self.want_write = False
+        self.written = threading.Event()
+        self.dispatcher = None
+
+    def init(self, dispatcher):
+        self.dispatcher = dispatcher
+
+    def readable(self, dispatcher):
+        return True
+
+    def writable(self, dispatcher):
+        return self.want_write
+
+    def handle_write(self, dispatcher):
+        self.want_write = False
+        self.written.set()
+
+    def next_check_interval(self):
+        return self.check_interval
+
+
+@contextmanager
+def running_reactor():
+    reactor = Reactor()
+    thread = concurrent.thread(reactor.process_requests, name="test reactor")
+    thread.start()
+    try:
+        yield reactor
+    finally:
+        reactor.stop()
+        thread.join()
+
+
+@pytest.mark.stress
+def test_reactor_idle_and_busy_connections():
+    idle_count = 1000
+    busy_count = 10
+    messages = 1000
+
+    with running_reactor() as reactor, \
+            closing(socket.socket()) as listener:
+        listener.bind(("127.0.0.1", 0))
+        listener.listen(128)
+        sockets = []
+        try:
+            for i in range(idle_count):
+                s1, s2 = tcp_socketpair(listener)
+                sockets.append(s2)
+                stompclient.StompClient(s1, reactor, owns_reactor=False,
+                                        incoming_heartbeat=0,
+                                        outgoing_heartbeat=0)
+
+            busy = []
+            for i in range(busy_count):
+                s1, s2 = tcp_socketpair(listener)
+                sockets.append(s2)
+                client = stompclient.StompClient(s1, reactor,
+                                                 owns_reactor=False,
+                                                 incoming_heartbeat=0,
+                                                 outgoing_heartbeat=0)
+                busy.append((client, s2))
+
+            # Consume the CONNECT frames and accept the connections.
+            for client, peer in busy:
+                read_frames(peer, 1)
+                peer.sendall(b"CONNECTED\nversion:1.2\n\n\0")
+
+            start = time.time()
+            for i in range(messages):
+                for client, peer in busy:
+                    client.send(b"x" * 100, destination="/queue/test")
+            for client, peer in busy:
+                read_frames(peer, messages)
+            elapsed = time.time() - start
+        finally:
+            for s in sockets:
+                s.close()
+
+    print("%d idle, %d busy connections, %d messages: %.3f seconds" % (
+        idle_count, busy_count, busy_count * messages, elapsed))
+
+
+def tcp_socketpair(listener):
+    client = socket.create_connection(listener.getsockname())
+    server, _ = listener.accept()
+    server.setblocking(0)
+    return server, client
+
+
+def read_frames(sock, count):
+    data = b""
+    while data.count(b"\0") < count:
+        data += sock.recv(65536)
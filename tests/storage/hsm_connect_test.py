@@ -22,6 +22,8 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import threading
+
 import pytest
 
 from storage.storagetestlib import FakeStorageDomainCache
@@ -45,15 +47,21 @@ class FakeConnectHSM(hsm.HSM):
 
 
 class FakeConnection(object):
-    def __init__(self, conInfo):
+    def __init__(self, conInfo, barrier=None):
         self.conInfo = conInfo
         self.connected = False
+        self.connect_calls = 0
+        self.barrier = barrier
 
     @property
     def id(self):
         return self.conInfo.params.id
 
     def connect(self):
+        self.connect_calls += 1
+        if self.barrier:
+            # Fails unless all connections are connected concurrently.
+            self.barrier.wait()
         if self.id.startswith("failing-"):
             raise Exception("Connection failed")
         self.connected = True
@@ -62,13 +70,24 @@ class FakeConnection(object):
         self.connected = False
 
 
+    def __eq__(self, other):
+        return self.conInfo == other.conInfo
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.conInfo)
+
+
 class FakeConnectionFactory(object):
     def __init__(self):
         self.connections = {}
+        self.barrier = None
 
     def createConnection(self, conInfo):
-        conn = FakeConnection(conInfo)
-        self.connections[conn.id] = conn
+        conn = FakeConnection(conInfo, barrier=self.barrier)
+        self.connections.setdefault(conn.id, conn)
         return conn
 
 
@@ -84,6 +103,7 @@ def fake_hsm(monkeypatch):
     monkeypatch.setattr(hsm.vars, 'task', task.Task("fake-task-id"))
     monkeypatch.setattr(storageServer, 'ConnectionFactory',
                         FakeConnectionFactory())
+    monkeypatch.setattr(hsm.udevadm, 'settle', lambda timeout: None)
     return FakeConnectHSM()
 
 
@@ -152,15 +172,15 @@ def test_failed_connection(fake_hsm, conn_type):
     ]
     result = fake_hsm.connectStorageServer(
         conn_type, 'SPUID', connections, None)
-    expected = {
-        'statuslist':
-            [
-                {'status': 0, 'id': 'success-1'},
-                {'status': 100, 'id': 'failing-1'},
-                {'status': 0, 'id': 'success-2'}
-            ]
-    }
-    assert expected == result
+    statuslist = [{'id': s['id'], 'status': s['status']}
+                  for s in result['statuslist']]
+    assert statuslist == [
+        {'status': 0, 'id': 'success-1'},
+        {'status': 100, 'id': 'failing-1'},
+        {'status': 0, 'id': 'success-2'}
+    ]
+    for status in result['statuslist']:
+        assert status['elapsed'] >= 0
     sc = storageServer.ConnectionFactory.connections
     assert sc["success-1"].connected
     assert sc["success-2"].connected
@@ -180,3 +200,34 @@ def test_cache_update(fake_hsm):
     sc = storageServer.ConnectionFactory.connections
     assert sc['1'].connected
     assert hsm.sdCache.knownSDs['sd-uuid-1'] == nfs_find_method
+
+
+def test_connect_concurrently(fake_hsm):
+    connections = [
+        {'id': str(i), 'connection': '/my_sd%d' % i, 'protocol_version': '3'}
+        for i in range(3)
+    ]
+    storageServer.ConnectionFactory.barrier = threading.Barrier(
+        len(connections), timeout=5)
+
+    result = fake_hsm.connectStorageServer(
+        sd.NFS_DOMAIN, 'SPUID', connections, None)
+
+    assert [s['status'] for s in result['statuslist']] == [0, 0, 0]
+
+
+def test_connect_duplicate(fake_hsm):
+    connections = [
+        {'id': '1', 'connection': '/my_sd', 'protocol_version': '3'},
+        {'id': '2', 'connection': '/my_sd2', 'protocol_version': '3'},
+        {'id': '1', 'connection': '/my_sd', 'protocol_version': '3'},
+    ]
+
+    result = fake_hsm.connectStorageServer(
+        sd.NFS_DOMAIN, 'SPUID', connections, None)
+
+    assert [(s['id'], s['status']) for s in result['statuslist']] == [
+        ('1', 0), ('2', 0), ('1', 0)]
+    sc = storageServer.ConnectionFactory.connections
+    assert sc['1'].connect_calls == 1
+    assert sc['2'].connect_calls == 1
@@ -150,6 +150,7 @@ class FakePool(object):
     def __init__(self, mailer):
         self.spmMailer = mailer
         self.volume_data = None
+        self.extended = []
 
     def extendVolume(self, sdUUID, volUUID, newSize):
         self.volume_data = {
@@ -157,6 +158,16 @@ class FakePool(object):
             'volumeID': volUUID,
             'size': newSize
         }
+        self.extended.append(volUUID)
+
+
+class FakeBatchSPMMailer(object):
+
+    def __init__(self):
+        self.replies = []
+
+    def sendReply(self, msg_id, msg):
+        self.replies.append((msg_id, msg))
 
 
 class TestSPMMailMonitor:
@@ -291,6 +302,39 @@ class TestCommunicate:
 
             assert filled.wait(MAILER_TIMEOUT * 2)
 
+    def test_roundtrip_batch(self, mboxfiles):
+        messages = 8
+        with make_hsm_mailbox(mboxfiles, 7) as hsm_mb:
+            with make_spm_mailbox(mboxfiles) as spm_mm:
+                pool = FakePool(spm_mm)
+                spm_mm.registerBatchMessageType(
+                    sm.EXTEND_CODE,
+                    partial(sm.SPM_Extend_Message.processRequests, pool),
+                    sm.SPM_Extend_Message.requestDomain)
+
+                done = threading.Event()
+                replies = []
+
+                def reply_msg_callback(vol_data):
+                    replies.append(vol_data['volumeID'])
+                    if len(replies) == messages:
+                        done.set()
+
+                requested = []
+                for i in range(messages):
+                    vol_data = volume_data(make_uuid())
+                    vol_data['freeSpace'] = i * MiB
+                    requested.append(vol_data['volumeID'])
+                    hsm_mb.sendExtendMsg(
+                        vol_data,
+                        2 * GiB,
+                        callbackFunction=reply_msg_callback)
+
+                assert done.wait(MAILER_TIMEOUT), "Roundtrip did not finish"
+
+        assert sorted(replies) == sorted(requested)
+        assert sorted(pool.extended) == sorted(requested)
+
     @pytest.mark.parametrize("delay", [0, 0.05])
     @pytest.mark.parametrize("messages", [
         1,
@@ -340,6 +384,7 @@ class TestCommunicate:
 
                 log.info("waiting for replies clearing")
                 assert done.wait(timeout), "Roundtrip did not finish"
+                assert sorted(pool.extended) == sorted(start)
 
                 log.info("waiting for messages clearing in SPM inbox")
                 deadline = time.time() + MAILER_TIMEOUT
@@ -359,6 +404,42 @@ class TestCommunicate:
 
 class TestExtendMessage:
 
+    def test_free_space(self):
+        vol_data = volume_data()
+        vol_data['freeSpace'] = 0x2a * MiB + 1
+        msg = sm.SPM_Extend_Message(vol_data, 128 * MiB)
+        assert msg.payload == extend_message()[:53] + b"000000002a0"
+
+    def test_free_space_reply(self):
+        vol_data = volume_data()
+        vol_data['freeSpace'] = 100 * MiB
+        msg = sm.SPM_Extend_Message(vol_data, 128 * MiB)
+        assert msg.checkReply(extend_message()) == sm.REPLY_OK
+
+    def test_process_requests_priority(self):
+        spm_mailer = FakeBatchSPMMailer()
+        pool = FakePool(spm_mailer)
+        requests = []
+        for msg_id, free in [(1, 300), (2, None), (3, 100)]:
+            vol_data = volume_data(make_uuid())
+            if free is not None:
+                vol_data['freeSpace'] = free * MiB
+            msg = sm.SPM_Extend_Message(vol_data, GiB)
+            requests.append((msg_id, msg.payload))
+
+        ret = sm.SPM_Extend_Message.processRequests(pool, requests)
+
+        assert ret == {'status': {'code': 0, 'message': 'Done'}}
+        # Requests without free space (older hosts) are served first, then
+        # requests with less free space.
+        assert [msg_id for msg_id, _ in spm_mailer.replies] == [2, 3, 1]
+        assert len(pool.extended) == 3
+
+    def test_request_domain(self):
+        payload = extend_message()
+        domain = sm.SPM_Extend_Message.requestDomain(payload)
+        assert domain == sm.misc.packUuid(volume_data()['domainID'])
+
     def test_no_domain(self):
         vol_data = volume_data()
         del vol_data['domainID']
@@ -299,3 +299,90 @@ class TestIsMountedTiming(VdsmTestCase):
             self.assertTrue(mount.isMounted(mountpoint % i))
             elapsed = time.time() - start
             print("%4d mounts: %f seconds" % (count, elapsed))
+
+
+class TestMountTable(VdsmTestCase):
+
+    def test_proc_mounts_parsed_once(self):
+        table = mount._MountTable()
+        records = table.records()
+        self.assertIs(table.records(), records)
+        self.assertEqual(table.generation, 1)
+
+    def test_fake_mounts_parsed_on_every_lookup(self):
+        table = mount._MountTable()
+        with fake_mounts(["server:/path /mnt/server:_path nfs4 opts 0 0"]):
+            first = table.records()
+            second = table.records()
+            self.assertEqual(first, second)
+            self.assertEqual(table.generation, 2)
+
+
+class FakeClock(object):
+
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeStatvfs(object):
+
+    def __init__(self, error=None):
+        self.calls = 0
+        self.error = error
+
+    def __call__(self, path):
+        self.calls += 1
+        if self.error:
+            raise self.error
+        return (path, self.calls)
+
+
+class TestStatvfsCache(VdsmTestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = mount._StatvfsCache(clock=self.clock)
+
+    def test_cached(self):
+        statvfs = FakeStatvfs()
+        first = self.cache.get("/path", 5, statvfs)
+        self.clock.now = 4
+        self.assertEqual(self.cache.get("/path", 5, statvfs), first)
+        self.assertEqual(statvfs.calls, 1)
+
+    def test_expired(self):
+        statvfs = FakeStatvfs()
+        self.cache.get("/path", 5, statvfs)
+        self.clock.now = 5
+        self.assertEqual(self.cache.get("/path", 5, statvfs), ("/path", 2))
+
+    def test_disabled(self):
+        statvfs = FakeStatvfs()
+        self.cache.get("/path", 0, statvfs)
+        self.cache.get("/path", 0, statvfs)
+        self.assertEqual(statvfs.calls, 2)
+
+    def test_per_path(self):
+        statvfs = FakeStatvfs()
+        self.cache.get("/path1", 5, statvfs)
+        self.assertEqual(self.cache.get("/path2", 5, statvfs), ("/path2", 2))
+
+    def test_error_cached(self):
+        statvfs = FakeStatvfs(OSError(errno.ESTALE, "Stale file handle"))
+        for i in range(2):
+            with self.assertRaises(OSError) as ctx:
+                self.cache.get("/path", 5, statvfs)
+            self.assertEqual(ctx.exception.errno, errno.ESTALE)
+        self.assertEqual(statvfs.calls, 1)
+
+    def test_mount_table_changed(self):
+        statvfs = FakeStatvfs()
+        with fake_mounts(["server:/path /mnt/server:_path nfs4 opts 0 0"]):
+            self.cache.get("/path", 5, statvfs)
+            # Every lookup of a fake mount table is a change.
+            mount._mount_table.records()
+            self.cache.get("/path", 5, statvfs)
+        self.assertEqual(statvfs.calls, 2)
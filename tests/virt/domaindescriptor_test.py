@@ -23,6 +23,7 @@ from __future__ import absolute_import
 from __future__ import division
 
 from vdsm.common import xmlutils
+from vdsm.virt import metadata
 from vdsm.virt.domain_descriptor import (DomainDescriptor,
                                          MutableDomainDescriptor)
 from testlib import VdsmTestCase, XMLTestCase, permutations, expandPermutations
@@ -107,6 +108,30 @@ ON_REBOOT_RESTART = """
 </domain>
 """
 
+ALIASED_DEVICES = """
+<domain>
+    <uuid>xyz</uuid>
+    <metadata xmlns:ovirt-vm="http://ovirt.org/vm/1.0">
+        <ovirt-vm:vm>
+            <ovirt-vm:foo>bar</ovirt-vm:foo>
+        </ovirt-vm:vm>
+    </metadata>
+    <devices>
+        <disk device="disk"><alias name="ua-disk"/></disk>
+        <interface type="bridge"><alias name="ua-nic"/></interface>
+    </devices>
+</domain>
+"""
+
+ALIASED_DEVICES_NO_NIC = """
+<domain>
+    <uuid>xyz</uuid>
+    <devices>
+        <disk device="disk"><alias name="ua-disk"/></disk>
+    </devices>
+</domain>
+"""
+
 NO_REBOOT = """
 <domain>
     <uuid>xyz</uuid>
@@ -137,6 +162,64 @@ class DevicesHashTests(VdsmTestCase):
         self.assertEqual(desc1.devices_hash, desc2.devices_hash)
 
 
+class DomainDescriptorDeltaTests(VdsmTestCase):
+
+    def test_without_device(self):
+        desc = DomainDescriptor(ALIASED_DEVICES)
+        updated = desc.without_device('ua-nic')
+        self.assertEqual(len(list(updated.get_device_elements('disk'))), 1)
+        self.assertEqual(
+            len(list(updated.get_device_elements('interface'))), 0)
+        # The original descriptor is not modified.
+        self.assertEqual(len(list(desc.get_device_elements('interface'))), 1)
+
+    def test_without_device_hash(self):
+        desc = DomainDescriptor(ALIASED_DEVICES)
+        updated = desc.without_device('ua-nic')
+        self.assertNotEqual(updated.devices_hash, desc.devices_hash)
+        self.assertEqual(
+            updated.devices_hash,
+            DomainDescriptor(ALIASED_DEVICES_NO_NIC).devices_hash)
+        self.assertEqual(
+            updated.devices_hash, DomainDescriptor(updated.xml).devices_hash)
+
+    def test_without_device_missing(self):
+        desc = DomainDescriptor(ALIASED_DEVICES)
+        with self.assertRaises(LookupError):
+            desc.without_device('ua-nonexistent')
+
+    def test_without_device_initial(self):
+        desc = DomainDescriptor(ALIASED_DEVICES, initial=True)
+        updated = desc.without_device('ua-nic')
+        self.assertIsNone(updated.devices_hash)
+
+    def test_with_metadata(self):
+        desc = DomainDescriptor(ALIASED_DEVICES)
+        md_desc = metadata.Descriptor.from_xml(ALIASED_DEVICES)
+        with md_desc.values() as vals:
+            vals['foo'] = 'baz'
+        updated = desc.with_metadata(md_desc)
+        with updated.metadata_descriptor() as md:
+            with md.values() as vals:
+                self.assertEqual(vals, {'foo': 'baz'})
+        # The original descriptor is not modified.
+        with desc.metadata_descriptor() as md:
+            with md.values() as vals:
+                self.assertEqual(vals, {'foo': 'bar'})
+        self.assertEqual(updated.devices_hash, desc.devices_hash)
+
+    def test_with_metadata_no_metadata(self):
+        desc = DomainDescriptor(SOME_DEVICES)
+        md_desc = metadata.Descriptor()
+        with md_desc.values() as vals:
+            vals['foo'] = 'baz'
+        updated = desc.with_metadata(md_desc)
+        with updated.metadata_descriptor() as md:
+            with md.values() as vals:
+                self.assertEqual(vals, {'foo': 'baz'})
+        self.assertEqual(updated.devices_hash, desc.devices_hash)
+
+
 @expandPermutations
 class DomainDescriptorTests(XMLTestCase):
 
@@ -31,6 +31,7 @@ from vdsm import utils
 from vdsm.common import response
 from vdsm.common.units import MiB, GiB
 from vdsm.virt.vmdevices.storage import Drive, DISK_TYPE, BLOCK_THRESHOLD
+from vdsm.virt.vmdevices.storage import BlockInfo
 from vdsm.virt.vmdevices import hwclass
 from vdsm.virt.utils import TimedAcquireLock
 from vdsm.virt import drivemonitor
@@ -191,6 +192,50 @@ class TestDiskExtensionWithPolling(DiskExtensionTestBase):
         self.assertEqual(len(testvm.cif.irs.extensions), 1)
         self.check_extension(vdb, drives[1], testvm.cif.irs.extensions[0])
 
+    def test_extend_drive_using_block_stats(self):
+        with make_env(
+                events_enabled=False,
+                drive_infos=self.DRIVE_INFOS) as (testvm, dom, drives):
+            vdb = dom.block_info['/virtio/1']
+            block_stats = {
+                '/virtio/0': BlockInfo(
+                    capacity=4 * GiB, allocation=0, physical=2 * GiB),
+                '/virtio/1': BlockInfo(
+                    capacity=vdb['capacity'],
+                    allocation=allocation_threshold_for_resize_mb(
+                        vdb, drives[1]) + 1 * MiB,
+                    physical=vdb['physical']),
+            }
+            # blockInfo() must not be used when block stats are available.
+            dom.block_info.clear()
+
+            extended = testvm.monitor_drives(block_stats=block_stats)
+
+        self.assertEqual(extended, True)
+        self.assertEqual(len(testvm.cif.irs.extensions), 1)
+        self.check_extension(vdb, drives[1], testvm.cif.irs.extensions[0])
+
+    def test_extend_drive_missing_block_stats(self):
+        with make_env(
+                events_enabled=False,
+                drive_infos=self.DRIVE_INFOS) as (testvm, dom, drives):
+            vda = dom.block_info['/virtio/0']
+            vda['allocation'] = 0 * MiB
+            vdb = dom.block_info['/virtio/1']
+            vdb['allocation'] = allocation_threshold_for_resize_mb(
+                vdb, drives[1]) + 1 * MiB
+            # vdb is queried using blockInfo().
+            block_stats = {
+                '/virtio/0': BlockInfo(
+                    vda['capacity'], vda['allocation'], vda['physical']),
+            }
+
+            extended = testvm.monitor_drives(block_stats=block_stats)
+
+        self.assertEqual(extended, True)
+        self.assertEqual(len(testvm.cif.irs.extensions), 1)
+        self.check_extension(vdb, drives[1], testvm.cif.irs.extensions[0])
+
     def test_extend_drive_allocation_equals_next_size(self):
         with make_env(
                 events_enabled=False,
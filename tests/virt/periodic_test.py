@@ -26,6 +26,8 @@ import logging
 import threading
 import time
 
+import libvirt
+
 from vdsm import executor
 from vdsm import schedule
 from vdsm import throttledlog
@@ -588,3 +590,141 @@ class PeriodicActionTests(TestCaseBase):
         vm.disk_devices = [ro_drive, rw_drive]
         periodic.UpdateVolumes(vm)._execute()
         self.assertEqual([d.name for d in vm.updated_drives], [rw_drive.name])
+
+
+class DriveWatermarkCollectorTests(TestCaseBase):
+
+    def setUp(self):
+        self.cif = fake.ClientIF()
+        for i in range(VM_NUM):
+            vm_id = _fake_vm_id(i)
+            with self.cif.vm_container_lock:
+                self.cif.vmContainer[vm_id] = _WatermarkVM(vm_id)
+
+    def test_bulk_stats(self):
+        conn = _FakeBulkConnection()
+        op = periodic.DriveWatermarkCollector(
+            conn, self.cif.getVMs, _FakeExecutor(), 0)
+        skipped = op()
+
+        self.assertEqual(skipped, [])
+        self.assertEqual(conn.calls, 1)
+        for vm_id, vm_obj in self.cif.getVMs().items():
+            self.assertEqual(vm_obj.block_stats, [{
+                '/path/to/' + vm_id: (4 * 1024, 1024, 2 * 1024),
+            }])
+
+    def test_bulk_stats_fail(self):
+        conn = _FakeBulkConnection(fail=True)
+        op = periodic.DriveWatermarkCollector(
+            conn, self.cif.getVMs, _FakeExecutor(), 0)
+        op()
+
+        for vm_obj in self.cif.getVMs().values():
+            self.assertEqual(vm_obj.block_stats, [None])
+
+    def test_skip_not_required(self):
+        vm_obj = self.cif.getVMs()[_fake_vm_id(0)]
+        vm_obj.drive_monitor.needed = False
+        conn = _FakeBulkConnection()
+        op = periodic.DriveWatermarkCollector(
+            conn, self.cif.getVMs, _FakeExecutor(), 0)
+        op()
+
+        self.assertEqual(vm_obj.block_stats, [])
+        self.assertEqual(len(conn.doms), VM_NUM - 1)
+
+    def test_skip_not_runnable(self):
+        vm_obj = self.cif.getVMs()[_fake_vm_id(0)]
+        vm_obj.ready = False
+        conn = _FakeBulkConnection()
+        op = periodic.DriveWatermarkCollector(
+            conn, self.cif.getVMs, _FakeExecutor(), 0)
+        skipped = op()
+
+        self.assertEqual(skipped, [vm_obj.id])
+        self.assertEqual(vm_obj.block_stats, [])
+        self.assertEqual(len(conn.doms), VM_NUM - 1)
+
+    def test_block_stats_from_bulk_stats(self):
+        dom_stats = {
+            'block.count': 3,
+            'block.0.path': '/complete',
+            'block.0.capacity': 3,
+            'block.0.allocation': 1,
+            'block.0.physical': 2,
+            # cdrom without media
+            'block.1.capacity': 0,
+            # allocation not available with NOWAIT
+            'block.2.path': '/incomplete',
+            'block.2.capacity': 3,
+            'block.2.physical': 2,
+        }
+        self.assertEqual(
+            periodic._block_stats_from_bulk_stats(dom_stats),
+            {'/complete': (3, 1, 2)})
+
+
+class _FakeDriveMonitor(object):
+
+    def __init__(self):
+        self.needed = True
+
+    def monitoring_needed(self):
+        return self.needed
+
+
+class _FakeLibvirtDomain(object):
+
+    def __init__(self, vm_id):
+        self._vm_id = vm_id
+
+    def UUIDString(self):
+        return self._vm_id
+
+
+class _FakeDomainAdapter(object):
+
+    def __init__(self, vm_id):
+        self._dom = _FakeLibvirtDomain(vm_id)
+
+
+class _WatermarkVM(_FakeVM):
+
+    def __init__(self, vm_id):
+        super(_WatermarkVM, self).__init__(vm_id, vm_id)
+        self.ready = True
+        self.drive_monitor = _FakeDriveMonitor()
+        self._dom = _FakeDomainAdapter(vm_id)
+        self.block_stats = []
+
+    def isDomainReadyForCommands(self):
+        return self.ready
+
+    def monitor_drives(self, block_stats=None):
+        self.block_stats.append(block_stats)
+
+
+class _FakeBulkConnection(object):
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.calls = 0
+        self.doms = []
+
+    def domainListGetStats(self, doms, stats=0, flags=0):
+        self.calls += 1
+        self.doms = doms
+        if self.fail:
+            raise fake.libvirt_error(
+                [libvirt.VIR_ERR_OPERATION_TIMEOUT], "Timeout")
+        return [
+            (dom, {
+                'block.count': 1,
+                'block.0.path': '/path/to/' + dom.UUIDString(),
+                'block.0.capacity': 4 * 1024,
+                'block.0.allocation': 1024,
+                'block.0.physical': 2 * 1024,
+            })
+            for dom in doms
+        ]
@@ -696,6 +696,50 @@ class DriveVolumeSizeTests(VdsmTestCase):
         self.assertEqual(drive.getMaxVolumeSize(self.CAPACITY), size)
 
 
+class DriveWriteRateTests(VdsmTestCase):
+
+    def test_no_rate(self):
+        conf = drive_config(format='cow', diskType=DISK_TYPE.BLOCK)
+        drive = Drive(self.log, **conf)
+        drive.update_write_rate(1 * GiB, now=100)
+        self.assertIsNone(drive.write_rate)
+        self.assertEqual(drive.volExtensionChunk, drive.VOLWM_CHUNK_SIZE)
+
+    def test_slow_writer(self):
+        conf = drive_config(format='cow', diskType=DISK_TYPE.BLOCK)
+        drive = Drive(self.log, **conf)
+        drive.update_write_rate(1 * GiB, now=100)
+        drive.update_write_rate(1 * GiB + 10 * MiB, now=110)
+        self.assertEqual(drive.write_rate, 1 * MiB)
+        self.assertEqual(drive.volExtensionChunk, drive.VOLWM_CHUNK_SIZE)
+
+    def test_fast_writer(self):
+        conf = drive_config(format='cow', diskType=DISK_TYPE.BLOCK)
+        drive = Drive(self.log, **conf)
+        rate = drive.VOLWM_CHUNK_SIZE * 2 // drive.VOLWM_RATE_WINDOW
+        drive.update_write_rate(1 * GiB, now=100)
+        drive.update_write_rate(1 * GiB + rate, now=101)
+        self.assertEqual(drive.volExtensionChunk,
+                         utils.round(2 * drive.VOLWM_CHUNK_SIZE, MiB))
+
+    def test_chunk_limit(self):
+        conf = drive_config(format='cow', diskType=DISK_TYPE.BLOCK)
+        drive = Drive(self.log, **conf)
+        drive.update_write_rate(1 * GiB, now=100)
+        drive.update_write_rate(1000 * GiB, now=101)
+        self.assertEqual(
+            drive.volExtensionChunk,
+            drive.VOLWM_CHUNK_SIZE * drive.VOLWM_CHUNK_RATE_MAX_MULT)
+
+    def test_top_volume_changed(self):
+        conf = drive_config(format='cow', diskType=DISK_TYPE.BLOCK)
+        drive = Drive(self.log, **conf)
+        drive.update_write_rate(1 * GiB, now=100)
+        drive.update_write_rate(2 * GiB, now=101)
+        drive.update_write_rate(0, now=102)
+        self.assertIsNone(drive.write_rate)
+
+
 @expandPermutations
 class TestDriveLeases(XMLTestCase):
     """